@@ -2,6 +2,7 @@ import os
 import streamlit as st
 import pandas as pd
 from utils import read_log, get_policies
+from jobs import count_active_jobs
 from auth import init_auth_state, login_box_in_sidebar, render_login_form_if_needed
 
 ICON = os.path.join(os.path.dirname(__file__), "icon.png")
@@ -29,11 +30,12 @@ email_total = int(df["이메일"].sum()) if "이메일" in df else 0
 phone_total = int(df["전화번호"].sum()) if "전화번호" in df else 0
 today_count = len(df[df["ts"].dt.date == pd.Timestamp.today().date()]) if not df.empty else 0
 
-m1, m2, m3, m4 = st.columns(4)
+m1, m2, m3, m4, m5 = st.columns(5)
 m1.metric("오늘 검사", today_count)
 m2.metric("총 RRN 탐지", rrn_total)
 m3.metric("총 이메일 탐지", email_total)
 m4.metric("총 전화번호 탐지", phone_total)
+m5.metric("진행 중 작업", count_active_jobs())
 
 # 정책 요약
 pol = get_policies(st.session_state)
@@ -0,0 +1,301 @@
+# st_app/crawler.py
+# 공유 폴더 정기 DLP 점검용 증분 크롤러
+#   python crawler.py //fileserver/share D:/공유 --workers 8 --mask-dir D:/masked
+# - 디렉터리 트리를 스레드로 병렬 탐색하고 manifest.db 에 경로/크기/수정시각/해시를 기록
+# - 크기·수정시각이 그대로인 파일은 읽지도 않고 건너뜀, 바뀐 파일도 해시가 같으면 건너뜀
+# - 새 파일/변경된 파일만 기존 패턴 검사·마스킹을 거쳐 탐지 결과를 감사 로그에 묶음 단위로 기록
+# - 검사에 실패한 파일은 오류와 시도 횟수를 기록하고, 파일이 바뀌지 않아도 1·2·4…일(최대 RETRY_MAX_DAYS)
+#   간격으로 다시 시도 (--retry-errors 로 즉시 재시도, 예: openpyxl 설치 후)
+# - 점검 후 더 이상 존재하지 않는 경로는 매니페스트에서 삭제
+#   (목록을 읽지 못한 디렉터리 아래는 삭제하지 않고, 루트 자체를 읽지 못하면 오류로 종료)
+import os, re, sys, json, time, hashlib, sqlite3, argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Optional
+from utils import DEFAULT_PATTERNS, mask_text, log_detections
+from tabular import is_tabular, scan_table
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(APP_DIR, "manifest.db")
+CONFIG_PATH = os.path.join(APP_DIR, "config", "settings.json")
+
+DEFAULT_EXTS = ["txt", "csv", "xlsx", "xls"]   # 파일 검사 페이지와 동일한 형식
+BATCH_SIZE = 500                               # 매니페스트/감사 로그 기록 단위
+RETRY_MAX_DAYS = 30                            # 검사 실패 파일 재시도 간격 상한
+
+
+def load_patterns() -> Dict[str, str]:
+    """설정 페이지에서 저장한 패턴이 있으면 반영"""
+    patterns = DEFAULT_PATTERNS.copy()
+    if os.path.exists(CONFIG_PATH):
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if isinstance(saved.get("patterns"), dict):
+                patterns.update(saved["patterns"])
+        except Exception as e:
+            print(f"[warn] 설정 파일을 불러오지 못했습니다: {e}", file=sys.stderr)
+    return patterns
+
+
+# ─────────────────────────────────────────────────────────────
+# 매니페스트
+# ─────────────────────────────────────────────────────────────
+def open_manifest(path: str = MANIFEST_PATH) -> sqlite3.Connection:
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime INTEGER,       -- st_mtime_ns
+            hash TEXT,           -- sha256 (검사 실패 시 NULL)
+            scanned TEXT,        -- 마지막 검사(시도) 시각
+            error TEXT,          -- 마지막 검사 오류 (성공 시 NULL)
+            attempts INTEGER DEFAULT 0   -- 연속 실패 횟수
+        )""")
+    # attempts 컬럼이 없던 예전 매니페스트 보완
+    if "attempts" not in [r[1] for r in con.execute("PRAGMA table_info(files)")]:
+        con.execute("ALTER TABLE files ADD COLUMN attempts INTEGER DEFAULT 0")
+    return con
+
+
+def load_manifest(con: sqlite3.Connection, root: str) -> Dict[str, tuple]:
+    """path -> (size, mtime, hash, error, scanned, attempts)"""
+    prefix = os.path.join(root, "")
+    rows = con.execute("SELECT path, size, mtime, hash, error, scanned, attempts FROM files "
+                       "WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+    return {r[0]: tuple(r[1:]) for r in rows}
+
+
+def save_manifest(con: sqlite3.Connection, rows: List[tuple]):
+    con.executemany("INSERT OR REPLACE INTO files (path, size, mtime, hash, scanned, error, attempts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    con.commit()
+
+
+def retry_due(scanned: Optional[str], attempts: Optional[int], now: Optional[float] = None) -> bool:
+    """검사 실패 파일을 다시 시도할 때가 됐는지 (연속 실패마다 간격을 두 배로)"""
+    if not scanned:
+        return True
+    days = min(2 ** max((attempts or 1) - 1, 0), RETRY_MAX_DAYS)
+    last = time.mktime(time.strptime(scanned, "%Y-%m-%d %H:%M:%S"))
+    return (now or time.time()) - last >= days * 86400
+
+
+def prune_manifest(con: sqlite3.Connection, paths: List[str]):
+    con.executemany("DELETE FROM files WHERE path=?", ((p,) for p in paths))
+    con.commit()
+
+
+# ─────────────────────────────────────────────────────────────
+# 디렉터리 병렬 탐색
+# ─────────────────────────────────────────────────────────────
+def _list_dir(path: str, exts: set):
+    """(파일 목록, 하위 디렉터리 목록, 목록 읽기 오류 또는 None)"""
+    files, dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append(e.path)
+                    elif e.is_file(follow_symlinks=False) and \
+                            os.path.splitext(e.name)[1].lower().lstrip(".") in exts:
+                        st = e.stat(follow_symlinks=False)
+                        files.append((e.path, st.st_size, st.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError as e:
+        return files, dirs, e
+    return files, dirs, None
+
+
+def walk_parallel(root: str, exts: set, threads: int, failed: Optional[List[str]] = None):
+    """
+    (path, size, mtime_ns) 를 생성. 하위 디렉터리마다 scandir 작업을 스레드 풀에 넣음
+    목록을 읽지 못한 하위 디렉터리는 failed 에 모으고, 루트를 읽지 못하면 OSError
+    """
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = {pool.submit(_list_dir, root, exts): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                path = pending.pop(fut)
+                files, dirs, err = fut.result()
+                if err is not None:
+                    if path == root:
+                        raise err
+                    print(f"[warn] {path}: {err}", file=sys.stderr)
+                    if failed is not None:
+                        failed.append(path)
+                for d in dirs:
+                    pending[pool.submit(_list_dir, d, exts)] = d
+                yield from files
+
+
+# ─────────────────────────────────────────────────────────────
+# 파일 검사 (프로세스 풀에서 실행)
+# ─────────────────────────────────────────────────────────────
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _masked_path(mask_dir: str, root: str, path: str, ext: str) -> str:
+    rel = os.path.relpath(path, root)
+    out = os.path.join(mask_dir, os.path.splitext(rel)[0] + ext)
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    return out
+
+
+def scan_file(path: str, root: str, old_hash: Optional[str], patterns: Dict[str, str],
+              mask_dir: Optional[str] = None) -> dict:
+    """해시 비교 후 내용이 바뀐 경우에만 검사. 반환 dict 의 skipped=True 면 검사 생략"""
+    try:
+        digest = _sha256_file(path)
+        if digest == old_hash:
+            return {"path": path, "hash": digest, "skipped": True}
+
+        columns = None
+        if is_tabular(path):
+            res = scan_table(path, path, patterns, mask=bool(mask_dir))
+            counts, columns = res["counts"], res["columns"]
+            if mask_dir and any(counts.values()):
+                with open(_masked_path(mask_dir, root, path, ".csv"), "w", encoding="utf-8", newline="") as f:
+                    f.write(res["masked_csv"])
+        else:
+            with open(path, "rb") as f:
+                text = f.read().decode(errors="ignore")
+            counts = {name: len(re.findall(pat, text)) for name, pat in patterns.items()}
+            if mask_dir and any(counts.values()):
+                with open(_masked_path(mask_dir, root, path, ".txt"), "w", encoding="utf-8") as f:
+                    f.write(mask_text(text, patterns))
+        return {"path": path, "hash": digest, "skipped": False, "counts": counts, "columns": columns}
+    except Exception as e:
+        return {"path": path, "hash": None, "skipped": False, "error": f"{type(e).__name__}: {e}"}
+
+
+# ─────────────────────────────────────────────────────────────
+# 점검 실행
+# ─────────────────────────────────────────────────────────────
+def sweep(root: str, con: sqlite3.Connection, patterns: Dict[str, str], exts: set,
+          workers: int, threads: int, mask_dir: Optional[str] = None, batch_size: int = BATCH_SIZE,
+          retry_errors: bool = False) -> dict:
+    root = os.path.abspath(root)
+    known = load_manifest(con, root)
+    stats = {"seen": 0, "unchanged": 0, "same_hash": 0, "scanned": 0, "flagged": 0, "errors": 0,
+             "retried": 0, "removed": 0}
+    manifest_rows, log_entries = [], []
+    meta = {}   # path -> (size, mtime, 이전 연속 실패 횟수) : 검사 대기 중인 파일
+    failed_dirs: List[str] = []
+
+    def flush():
+        save_manifest(con, manifest_rows)
+        log_detections(log_entries)
+        manifest_rows.clear()
+        log_entries.clear()
+
+    def collect(res: dict):
+        size, mtime, attempts = meta.pop(res["path"])
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        if res.get("error"):
+            stats["errors"] += 1
+            print(f"[error] {res['path']}: {res['error']}", file=sys.stderr)
+            # 크기/수정시각과 함께 남겨 두고 retry_due() 간격이 지나거나 파일이 바뀌면 다시 시도
+            manifest_rows.append((res["path"], size, mtime, None, now, res["error"], attempts + 1))
+        elif res["skipped"]:
+            stats["same_hash"] += 1
+            # 내용은 같으니 마지막 검사 시각은 유지하고 크기/수정시각만 갱신
+            old_scanned = con.execute("SELECT scanned FROM files WHERE path=?", (res["path"],)).fetchone()
+            manifest_rows.append((res["path"], size, mtime, res["hash"], old_scanned[0] if old_scanned else now,
+                                  None, 0))
+        else:
+            stats["scanned"] += 1
+            manifest_rows.append((res["path"], size, mtime, res["hash"], now, None, 0))
+            if any(res["counts"].values()):
+                stats["flagged"] += 1
+                log_entries.append((res["path"], res["counts"], res["columns"]))
+        if len(manifest_rows) >= batch_size:
+            flush()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = set()
+        for path, size, mtime in walk_parallel(root, exts, threads, failed_dirs):
+            stats["seen"] += 1
+            old = known.pop(path, None)   # 남은 항목 = 이번 점검에서 보이지 않은 (삭제된) 경로
+            attempts = 0
+            if old and old[0] == size and old[1] == mtime:
+                if not old[3]:
+                    stats["unchanged"] += 1
+                    continue
+                # 지난번 검사에 실패한 파일: 잠김/의존성 누락 등은 나중에 풀릴 수 있으므로 간격을 두고 재시도
+                if not (retry_errors or retry_due(old[4], old[5])):
+                    stats["unchanged"] += 1
+                    continue
+                stats["retried"] += 1
+                attempts = old[5] or 0
+            meta[path] = (size, mtime, attempts)
+            futures.add(pool.submit(scan_file, path, root, old[2] if old else None, patterns, mask_dir))
+            # 제출 대기열이 너무 커지지 않도록 완료된 것부터 회수
+            if len(futures) >= workers * 4:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    collect(fut.result())
+        for fut in futures:
+            collect(fut.result())
+    flush()
+    # 목록을 읽지 못한 디렉터리 아래 경로는 보이지 않았다고 해서 삭제된 것이 아님
+    failed_prefixes = tuple(os.path.join(d, "") for d in failed_dirs)
+    gone = [p for p in known if not p.startswith(failed_prefixes)]
+    prune_manifest(con, gone)
+    stats["removed"] = len(gone)
+    stats["unlisted_dirs"] = len(failed_dirs)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="공유 폴더 증분 DLP 점검")
+    ap.add_argument("roots", nargs="+", help="점검할 디렉터리")
+    ap.add_argument("--manifest", default=MANIFEST_PATH, help="매니페스트 DB 경로")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="검사 프로세스 수")
+    ap.add_argument("--threads", type=int, default=16, help="디렉터리 탐색 스레드 수")
+    ap.add_argument("--ext", default=",".join(DEFAULT_EXTS), help="검사할 확장자 (쉼표로 구분)")
+    ap.add_argument("--mask-dir", help="탐지된 파일의 마스킹 사본을 저장할 디렉터리")
+    ap.add_argument("--batch", type=int, default=BATCH_SIZE, help="매니페스트/감사 로그 기록 단위")
+    ap.add_argument("--retry-errors", action="store_true",
+                    help="이전에 검사에 실패한 파일을 재시도 간격과 관계없이 다시 검사")
+    args = ap.parse_args(argv)
+
+    patterns = load_patterns()
+    exts = {e.strip().lower().lstrip(".") for e in args.ext.split(",") if e.strip()}
+    con = open_manifest(args.manifest)
+    status = 0
+    try:
+        for root in args.roots:
+            t0 = time.time()
+            try:
+                stats = sweep(root, con, patterns, exts, args.workers, args.threads, args.mask_dir, args.batch,
+                              args.retry_errors)
+            except OSError as e:
+                # 공유 폴더 미연결 등 — 매니페스트는 건드리지 않고 실패로 종료
+                print(f"[error] {root}: 디렉터리를 읽을 수 없습니다: {e}", file=sys.stderr)
+                status = 1
+                continue
+            elapsed = max(time.time() - t0, 1e-6)
+            skipped = stats["unchanged"] + stats["same_hash"]
+            skip_ratio = skipped / stats["seen"] if stats["seen"] else 0.0
+            print(f"[{root}] 파일 {stats['seen']:,}개 · 검사 {stats['scanned']:,} · 건너뜀 {skipped:,} "
+                  f"(비율 {skip_ratio:.1%}) · 탐지 {stats['flagged']:,} · 오류 {stats['errors']:,} "
+                  f"(재시도 {stats['retried']:,}) · "
+                  f"삭제 {stats['removed']:,} · 읽기 실패 디렉터리 {stats['unlisted_dirs']:,} · "
+                  f"{stats['seen'] / elapsed:,.0f} files/sec · {elapsed:.1f}초")
+    finally:
+        con.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+# st_app/jobs.py
+# 백그라운드 검사 작업 큐 (SQLite + 작업별 워커 프로세스)
+#  - 페이지는 submit_job() 으로 작업을 넣고 list_jobs()/get_job() 으로 진행률·결과를 폴링
+#  - 워커는 `python jobs.py run <job_id>` 로 별도 프로세스에서 실행되므로
+#    Streamlit 재실행/페이지 이동/새로고침과 무관하게 끝까지 진행되고 결과는 DB 에 남음
+import os, re, sys, json, time, sqlite3, subprocess, threading
+from typing import Dict, List, Optional
+from utils import mask_text, log_detection, scan_email
+from tabular import is_tabular, scan_table
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+JOB_DB = os.path.join(APP_DIR, "jobs.db")
+JOB_DIR = os.path.join(APP_DIR, "jobs")   # 업로드 원본/마스킹 결과 임시 보관
+
+MAX_JOBS_PER_USER = 2   # 사용자별 동시 실행 작업 수
+MAX_WORKERS = 4         # 전체 동시 실행 워커 수
+HEARTBEAT_SEC = 15      # 워커 생존 신호 주기
+STALE_SEC = 120         # 이 시간 동안 생존 신호가 없는 실행 작업은 워커가 죽은 것으로 간주
+RETENTION_DAYS = 7      # 끝난 작업 기록/마스킹 결과 보관 기간
+
+ACTIVE = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _connect() -> sqlite3.Connection:
+    con = sqlite3.connect(JOB_DB, timeout=30, isolation_level=None)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            kind TEXT NOT NULL,          -- file | email
+            name TEXT NOT NULL,
+            status TEXT NOT NULL,        -- queued | running | done | failed | cancelled
+            progress REAL DEFAULT 0,
+            cancel INTEGER DEFAULT 0,
+            params TEXT,
+            result TEXT,
+            error TEXT,
+            created TEXT,
+            started TEXT,
+            updated REAL,
+            finished TEXT
+        )""")
+    return con
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _input_path(job_id: int) -> str:
+    return os.path.join(JOB_DIR, f"{job_id}.bin")
+
+
+def _row_to_dict(row: sqlite3.Row) -> dict:
+    job = dict(row)
+    job["params"] = json.loads(job["params"]) if job["params"] else {}
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+
+# ─────────────────────────────────────────────────────────────
+# 페이지에서 사용하는 API
+# ─────────────────────────────────────────────────────────────
+def submit_job(user: str, kind: str, name: str, data: bytes, params: Dict) -> int:
+    """작업 등록 후 바로 디스패치. 반환값은 작업 ID"""
+    os.makedirs(JOB_DIR, exist_ok=True)
+    con = _connect()
+    try:
+        cur = con.execute(
+            "INSERT INTO jobs (user, kind, name, status, params, created) VALUES (?, ?, ?, 'submitting', ?, ?)",
+            (user, kind, name, json.dumps(params, ensure_ascii=False), _now()),
+        )
+        job_id = cur.lastrowid
+        # 입력 파일을 다 쓴 뒤에 대기열에 올려야 워커가 빈 파일을 집어가지 않음
+        try:
+            with open(_input_path(job_id), "wb") as f:
+                f.write(data)
+        except OSError as e:
+            con.execute("UPDATE jobs SET status='failed', error=?, finished=? WHERE id=?",
+                        (f"입력 저장 실패: {e}", _now(), job_id))
+            _cleanup(job_id, keep_output=False)
+            raise
+        con.execute("UPDATE jobs SET status='queued' WHERE id=?", (job_id,))
+    finally:
+        con.close()
+    dispatch()
+    return job_id
+
+
+def cancel_job(job_id: int):
+    """대기 중이면 즉시 취소, 실행 중이면 워커가 다음 진행률 보고 때 중단"""
+    con = _connect()
+    try:
+        dequeued = con.execute("UPDATE jobs SET status='cancelled', finished=? WHERE id=? AND status='queued'",
+                               (_now(), job_id)).rowcount
+        con.execute("UPDATE jobs SET cancel=1 WHERE id=? AND status='running'", (job_id,))
+    finally:
+        con.close()
+    if dequeued:
+        _cleanup(job_id, keep_output=False)
+
+
+def get_job(job_id: int) -> Optional[dict]:
+    con = _connect()
+    try:
+        row = con.execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+    finally:
+        con.close()
+    return _row_to_dict(row) if row else None
+
+
+def list_jobs(user: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[dict]:
+    sql, args = "SELECT * FROM jobs WHERE 1=1", []
+    if user:
+        sql += " AND user=?"
+        args.append(user)
+    if kind:
+        sql += " AND kind=?"
+        args.append(kind)
+    sql += " ORDER BY id DESC LIMIT ?"
+    args.append(limit)
+    con = _connect()
+    try:
+        rows = con.execute(sql, args).fetchall()
+    finally:
+        con.close()
+    return [_row_to_dict(r) for r in rows]
+
+
+def count_active_jobs(user: Optional[str] = None) -> int:
+    sql, args = "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')", []
+    if user:
+        sql += " AND user=?"
+        args.append(user)
+    con = _connect()
+    try:
+        return con.execute(sql, args).fetchone()[0]
+    finally:
+        con.close()
+
+
+def _spawn(job_id: int):
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "run", str(job_id)],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def dispatch():
+    """
+    동시 실행 제한 안에서 대기 작업을 워커 프로세스로 시작.
+    작업 등록/종료 때와 작업 목록 패널의 폴링마다 호출되므로, 죽은 워커나 오래된 기록 정리도 여기서 함
+    """
+    con = _connect()
+    try:
+        # IMMEDIATE 트랜잭션으로 여러 프로세스가 같은 작업을 동시에 집어가지 않도록 함
+        con.execute("BEGIN IMMEDIATE")
+        # 워커가 비정상 종료되어 슬롯을 계속 차지하는 작업, 입력 저장 중 멈춘 작업 정리
+        stale_at = time.time() - STALE_SEC
+        dead = [r["id"] for r in con.execute(
+            "SELECT id FROM jobs WHERE (status='running' AND updated < ?) OR (status='submitting' AND created < ?)",
+            (stale_at, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stale_at))))]
+        con.executemany("UPDATE jobs SET status='failed', error='워커 응답 없음', finished=? WHERE id=?",
+                        [(_now(), job_id) for job_id in dead])
+        # 보관 기간이 지난 작업 삭제
+        expired = [r["id"] for r in con.execute(
+            "SELECT id FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished < ?",
+            (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - RETENTION_DAYS * 86400)),))]
+        con.executemany("DELETE FROM jobs WHERE id=?", [(job_id,) for job_id in expired])
+        running = {r["user"]: r["n"] for r in con.execute(
+            "SELECT user, COUNT(*) AS n FROM jobs WHERE status='running' GROUP BY user")}
+        total = sum(running.values())
+        started = []
+        for row in con.execute("SELECT id, user FROM jobs WHERE status='queued' ORDER BY id").fetchall():
+            if total >= MAX_WORKERS:
+                break
+            if running.get(row["user"], 0) >= MAX_JOBS_PER_USER:
+                continue
+            con.execute("UPDATE jobs SET status='running', started=?, updated=? WHERE id=?",
+                        (_now(), time.time(), row["id"]))
+            running[row["user"]] = running.get(row["user"], 0) + 1
+            total += 1
+            started.append(row["id"])
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+    # 죽은 작업의 입력에는 마스킹 전 원본이 들어 있으므로 바로 삭제
+    for job_id in dead + expired:
+        _cleanup(job_id, keep_output=False)
+    for job_id in started:
+        try:
+            _spawn(job_id)
+        except OSError as e:
+            _finish(job_id, "failed", error=f"워커 시작 실패: {e}")
+
+
+# ─────────────────────────────────────────────────────────────
+# 워커
+# ─────────────────────────────────────────────────────────────
+def _report(job_id: int, progress: float):
+    """진행률 기록. 취소 요청이 있으면 JobCancelled"""
+    con = _connect()
+    try:
+        con.execute("UPDATE jobs SET progress=?, updated=? WHERE id=?",
+                    (min(progress, 1.0), time.time(), job_id))
+        cancel = con.execute("SELECT cancel FROM jobs WHERE id=?", (job_id,)).fetchone()["cancel"]
+    finally:
+        con.close()
+    if cancel:
+        raise JobCancelled()
+
+
+def _finish(job_id: int, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+    con = _connect()
+    try:
+        con.execute(
+            # 실행 중인 작업만 종료 처리 (이미 실패 처리된 작업을 되살리지 않도록)
+            "UPDATE jobs SET status=?, progress=?, result=?, error=?, finished=? WHERE id=? AND status='running'",
+            (status, 1.0 if status == "done" else None,
+             json.dumps(result, ensure_ascii=False) if result is not None else None,
+             error, _now(), job_id),
+        )
+    finally:
+        con.close()
+
+
+def _heartbeat(job_id: int, stop: threading.Event):
+    # 엑셀 읽기나 큰 텍스트의 정규식 처리처럼 진행률 보고가 뜸한 구간에서도
+    # dispatch() 가 살아 있는 작업을 죽은 것으로 오인하지 않도록 주기적으로 갱신
+    while not stop.wait(HEARTBEAT_SEC):
+        con = _connect()
+        try:
+            con.execute("UPDATE jobs SET updated=? WHERE id=? AND status='running'", (time.time(), job_id))
+        except sqlite3.Error:
+            pass
+        finally:
+            con.close()
+
+
+def _cleanup(job_id: int, keep_output: bool = True):
+    paths = [_input_path(job_id)]
+    if not keep_output:
+        paths.append(os.path.join(JOB_DIR, f"{job_id}_masked.csv"))
+    for p in paths:
+        try:
+            os.remove(p)
+        except OSError:
+            pass
+
+
+def _run_file(job: dict, path: str) -> dict:
+    patterns = job["params"]["patterns"]
+    if is_tabular(job["name"]):
+        size = os.path.getsize(path) or 1
+        with open(path, "rb") as fh:
+            # 청크 단위로 읽힌 바이트 위치로 진행률 계산 (엑셀은 한 번에 읽으므로 끝에서만 갱신)
+            res = scan_table(fh, job["name"], patterns, mask=True,
+                             progress=lambda rows: _report(job["id"], fh.tell() / size))
+        masked_path = os.path.join(JOB_DIR, f"{job['id']}_masked.csv")
+        with open(masked_path, "w", encoding="utf-8", newline="") as f:
+            f.write(res["masked_csv"])
+        log_detection(job["name"], res["counts"], res["columns"])
+        return {
+            "counts": res["counts"],
+            "columns": res["columns"],
+            "rows": res["rows"],
+            "elapsed": res["elapsed"],
+            "masked_path": masked_path,
+        }
+
+    with open(path, "rb") as f:
+        text = f.read().decode(errors="ignore")
+    counts = {}
+    for i, (name, pat) in enumerate(patterns.items()):
+        counts[name] = len(re.findall(pat, text))
+        _report(job["id"], (i + 1) / (len(patterns) + 1))
+    preview = mask_text(text, patterns)[:2000]
+    log_detection(job["name"], counts)
+    return {"counts": counts, "masked_preview": preview}
+
+
+def _run_email(job: dict, path: str) -> dict:
+    with open(path, "rb") as f:
+        body_text = f.read().decode(errors="ignore")
+    res = scan_email(body_text, job["params"]["policies"])
+    _report(job["id"], 0.9)
+    log_detection(f"[이메일] {job['name']}", {"이메일": len(res["emails"]), "전화번호": len(res["phones"])})
+    # 탐지된 주소/번호 원문은 DB 에 남기지 않고 건수와 의심 URL 만 보관
+    return {
+        "email_count": len(res["emails"]),
+        "phone_count": len(res["phones"]),
+        "url_count": len(res["urls"]),
+        "bad_urls": res["bad_urls"],
+    }
+
+
+def run_job(job_id: int):
+    job = get_job(job_id)
+    if job is None or job["status"] != "running":
+        return
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True).start()
+    try:
+        runner = _run_email if job["kind"] == "email" else _run_file
+        result = runner(job, _input_path(job_id))
+        _finish(job_id, "done", result)
+        _cleanup(job_id)
+    except JobCancelled:
+        _finish(job_id, "cancelled")
+        _cleanup(job_id, keep_output=False)
+    except Exception as e:
+        _finish(job_id, "failed", error=f"{type(e).__name__}: {e}")
+        _cleanup(job_id, keep_output=False)
+    finally:
+        stop.set()
+        # 슬롯이 비었으니 다음 대기 작업 시작
+        dispatch()
+
+
+# ─────────────────────────────────────────────────────────────
+# Streamlit 작업 목록 패널 (워커에서는 streamlit 을 불러오지 않도록 함수 안에서 import)
+# ─────────────────────────────────────────────────────────────
+STATUS_LABEL = {
+    "queued": "⏳ 대기",
+    "running": "🔄 실행 중",
+    "done": "✅ 완료",
+    "failed": "❌ 실패",
+    "cancelled": "🚫 취소됨",
+}
+
+
+def render_job_panel(user: str, kind: str, limit: int = 10):
+    import streamlit as st
+
+    @st.fragment(run_every=2)
+    def _panel():
+        # 폴링마다 디스패치해 죽은 워커의 슬롯을 회수하고 대기 작업을 이어서 시작
+        dispatch()
+        jobs = list_jobs(user=user, kind=kind, limit=limit)
+        if not jobs:
+            st.caption("등록된 작업이 없습니다.")
+            return
+        for job in jobs:
+            with st.container(border=True):
+                c1, c2 = st.columns([6, 1], vertical_alignment="center")
+                c1.markdown(f"**#{job['id']} {job['name']}** · {STATUS_LABEL.get(job['status'], job['status'])}"
+                            f" · {job['created']}")
+                if job["status"] in ACTIVE:
+                    if c2.button("취소", key=f"cancel_job_{job['id']}", use_container_width=True):
+                        cancel_job(job["id"])
+                        st.rerun(scope="fragment")
+                    st.progress(float(job["progress"] or 0))
+                elif job["status"] == "failed":
+                    st.error(job["error"])
+                elif job["status"] == "done":
+                    _render_result(st, job)
+
+    _panel()
+
+
+def _render_result(st, job: dict):
+    res = job["result"] or {}
+    if job["kind"] == "email":
+        m1, m2, m3 = st.columns(3)
+        m1.metric("이메일 주소 수", res.get("email_count", 0))
+        m2.metric("전화번호 수", res.get("phone_count", 0))
+        m3.metric("URL 수", res.get("url_count", 0))
+        if res.get("bad_urls"):
+            st.error(f"🚫 의심 URL {len(res['bad_urls'])}건")
+            st.write(res["bad_urls"][:10])
+        return
+
+    counts = res.get("counts", {})
+    cols = st.columns(max(len(counts), 1))
+    for i, (k, v) in enumerate(counts.items()):
+        cols[i].metric(k, v)
+    if "rows" in res:
+        st.caption(f"{res['rows']:,}행 · {res['elapsed']:.1f}초")
+    if res.get("columns"):
+        st.dataframe(
+            [{"컬럼": col, "유형": name, "건수": n}
+             for col, hits in res["columns"].items() for name, n in hits.items()],
+            use_container_width=True,
+        )
+    masked_path = res.get("masked_path")
+    if masked_path and os.path.exists(masked_path):
+        with open(masked_path, "rb") as f:
+            st.download_button("🔽 마스킹된 CSV 다운로드", data=f.read(),
+                               file_name=f"masked_{job['name'].rsplit('.', 1)[0]}.csv",
+                               mime="text/csv", key=f"dl_job_{job['id']}")
+    elif res.get("masked_preview"):
+        with st.expander("미리보기(마스킹 적용)"):
+            st.text(res["masked_preview"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "run":
+        run_job(int(sys.argv[2]))
+    else:
+        print("usage: python jobs.py run <job_id>")
@@ -1,21 +1,98 @@
 import streamlit as st
-import re
+import re, hashlib
+from utils import get_patterns, log_detection, mask_text
+from tabular import TABULAR_TYPES, is_tabular, scan_table
+from jobs import submit_job, render_job_panel
 st.set_page_config(page_title="파일 검사", layout="wide", page_icon="📂")
 st.markdown("# 📂 파일 검사")
 
-files = st.file_uploader("파일 업로드", accept_multiple_files=True, type=["txt"])
+USER = st.session_state.get("username") or "guest"
+background = st.toggle("백그라운드 작업으로 검사", key="file_background",
+                       help="검사 중 다른 페이지로 이동하거나 새로고침해도 작업이 계속되고 결과가 보관됩니다.")
+
+files = st.file_uploader("파일 업로드", accept_multiple_files=True, type=["txt"] + TABULAR_TYPES)
+# 설정 페이지에서 편집/추가한 패턴(카드번호 등 커스텀 포함)을 그대로 사용
+PATTERNS = get_patterns(st.session_state)
+
+if background:
+    if files and st.button("📂 검사 작업 등록"):
+        for f in files:
+            job_id = submit_job(USER, "file", f.name, f.getvalue(), {"patterns": PATTERNS})
+            st.toast(f"작업 #{job_id} 등록됨: {f.name}")
+    st.subheader("내 파일 검사 작업")
+    render_job_panel(USER, "file")
+    st.stop()
+
 if not files:
-    st.caption("샘플: .txt 파일을 올려보세요 (주민번호, 이메일 탐지 예시).")
+    st.caption("샘플: .txt 파일을 올려보세요 (주민번호, 이메일 탐지 예시). 고객 명단 등 CSV/XLSX 는 컬럼 단위로 검사합니다.")
     st.stop()
 
-PATTERNS = {
-    "주민등록번호": r"\b\d{6}-\d{7}\b",
-    "이메일": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
-    "전화번호": r"\b01[016789]-?\d{3,4}-?\d{4}\b",
-}
+def _scan(f, mask):
+    f.seek(0)
+    try:
+        return scan_table(f, f.name, PATTERNS, mask=mask)
+    except Exception as e:
+        # 깨진 CSV(ParserError), openpyxl/xlrd 미설치 엑셀 등 — 이 파일만 건너뛰고 나머지는 계속 표시
+        st.error(f"표 파일을 읽지 못했습니다: {type(e).__name__}: {e}")
+        return None
+
+def show_tabular(f, cache, key):
+    # 표 형식 파일은 재실행(위젯 조작)마다 다시 검사하지 않도록 세션에 결과 보관
+    if key not in cache:
+        with st.spinner("컬럼 단위 검사 중…"):
+            res = _scan(f, mask=False)
+        if res is None:
+            return
+        cache[key] = {"scan": res, "masked": None}
+        log_detection(f.name, res["counts"], res["columns"])
+    entry = cache[key]
+    res = entry["scan"]
+
+    cols = st.columns(len(PATTERNS))
+    for i, (k, v) in enumerate(res["counts"].items()):
+        cols[i].metric(k, v)
+    st.caption(f"{res['rows']:,}행 · {res['elapsed']:.1f}초")
+
+    if res["columns"]:
+        st.dataframe(
+            [{"컬럼": col, "유형": name, "건수": n}
+             for col, hits in res["columns"].items() for name, n in hits.items()],
+            use_container_width=True,
+        )
+    else:
+        st.caption("개인정보로 분류된 컬럼이 없습니다.")
 
+    if st.toggle("마스킹 보기", key=f"mask_{f.name}"):
+        # 마스킹본(파일 전체 크기의 CSV 문자열)은 켰을 때만 만듦
+        if entry["masked"] is None:
+            with st.spinner("마스킹 중…"):
+                entry["masked"] = _scan(f, mask=True)
+            if entry["masked"] is None:
+                return
+        masked = entry["masked"]
+        st.dataframe(masked["masked_preview"], use_container_width=True)
+        st.download_button(
+            "🔽 마스킹된 CSV 다운로드",
+            data=masked["masked_csv"].encode("utf-8"),
+            file_name=f"masked_{f.name.rsplit('.', 1)[0]}.csv",
+            mime="text/csv",
+            key=f"dl_{f.name}",
+        )
+    else:
+        st.dataframe(res["preview"], use_container_width=True)
+
+tabular_cache = st.session_state.setdefault("tabular_results", {})
+live_keys = set()
 for f in files:
     st.subheader(f"파일: {f.name}")
+    if is_tabular(f.name):
+        # 이름/크기가 같은 다른 파일과 섞이지 않도록 내용 해시로 구분
+        key = (hashlib.sha256(f.getvalue()).hexdigest(), tuple(PATTERNS.items()))
+        live_keys.add(key)
+        show_tabular(f, tabular_cache, key)
+        st.divider()
+        continue
+
     text = f.read().decode(errors="ignore")
 
     results = {}
@@ -27,16 +104,14 @@ for f in files:
         cols[i].metric(k, len(v))
 
     if st.toggle("마스킹 보기", key=f"mask_{f.name}"):
-        masked = text
-        for name, pat in PATTERNS.items():
-            if name == "이메일":
-                masked = re.sub(pat, lambda m: m.group(0).split("@")[0][:2] + "***@***", masked)
-            elif name == "주민등록번호":
-                masked = re.sub(pat, "******-*******", masked)
-            elif name == "전화번호":
-                masked = re.sub(pat, "***-****-****", masked)
+        masked = mask_text(text, PATTERNS)
         st.text_area("미리보기(마스킹 적용)", masked, height=200)
     else:
         st.text_area("미리보기(원본)", text[:2000], height=200)
 
     st.divider()
+
+# 지금 올라와 있지 않은 파일(이전 업로드, 바뀌기 전 패턴)의 결과는 메모리에서 제거
+for key in list(tabular_cache):
+    if key not in live_keys:
+        del tabular_cache[key]
@@ -1,6 +1,6 @@
 import streamlit as st
-import re
-from utils import get_policies, extract_urls, classify_urls
+from utils import get_policies, scan_email
+from jobs import submit_job, render_job_panel
 
 st.set_page_config(page_title="이메일 검사", layout="wide", page_icon="📧")
 st.markdown("# 📧 이메일 검사")
@@ -23,19 +23,26 @@ if uploaded:
     except Exception:
         st.warning("첨부 텍스트 병합 실패(인코딩 등)")
 
+USER = st.session_state.get("username") or "guest"
+background = st.toggle("백그라운드 작업으로 검사", key="email_background",
+                       help="검사 중 다른 페이지로 이동하거나 새로고침해도 작업이 계속되고 결과가 보관됩니다.")
+
+if background:
+    if body_text.strip() and st.button("📨 검사 작업 등록"):
+        # 작업 이름에 본문 내용이 남지 않도록 첨부파일명 또는 길이만 사용
+        name = uploaded.name if uploaded else f"본문 {len(body_text):,}자"
+        job_id = submit_job(USER, "email", name, body_text.encode("utf-8"), {"policies": POL})
+        st.toast(f"작업 #{job_id} 등록됨")
+    st.subheader("내 이메일 검사 작업")
+    render_job_panel(USER, "email")
+    st.stop()
+
 if not body_text.strip():
     st.stop()
 
 with st.spinner("이메일 분석 중…"):
-    # 단순 PII 패턴(데모) – 파일 검사보다 간략
-    EMAIL_PAT = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
-    PHONE_PAT = r"\b01[016789]-?\d{3,4}-?\d{4}\b"
-
-    emails = re.findall(EMAIL_PAT, body_text)
-    phones = re.findall(PHONE_PAT, body_text)
-
-    urls = extract_urls(body_text)
-    ok_urls, bad_urls = classify_urls(urls, POL)
+    res = scan_email(body_text, POL)
+    emails, phones, urls, bad_urls = res["emails"], res["phones"], res["urls"], res["bad_urls"]
 
 m1, m2, m3 = st.columns(3)
 m1.metric("이메일 주소 수", len(emails))
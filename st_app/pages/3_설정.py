@@ -50,7 +50,7 @@ with colA:
     st.subheader("🧾 탐지 패턴 (Regex)")
     st.caption("잘못된 정규표현식은 저장 시 자동 검증됩니다.")
     pat_inputs = {}
-    for k in ["주민등록번호", "이메일", "전화번호"]:
+    for k in ["주민등록번호", "이메일", "전화번호", "카드번호"]:
         pat_inputs[k] = st.text_input(k, PATTERNS.get(k, DEFAULT_PATTERNS[k]), key=f"pat_{k}")
 
     with st.expander("커스텀 패턴 추가", expanded=False):
@@ -1,11 +1,23 @@
 import os
 import streamlit as st
 import pandas as pd
-from utils import read_log
+from utils import read_log, DEFAULT_PATTERNS
+from jobs import list_jobs
 
 st.set_page_config(page_title="로그 대시보드", layout="wide", page_icon="📈")
 st.markdown("# 📈 로그 대시보드")
 
+# 백그라운드 검사 작업
+st.subheader("백그라운드 작업")
+jobs = list_jobs(limit=100)
+if jobs:
+    st.dataframe(
+        pd.DataFrame(jobs)[["id", "user", "kind", "name", "status", "progress", "created", "finished"]],
+        use_container_width=True,
+    )
+else:
+    st.caption("등록된 작업이 없습니다.")
+
 df = read_log()
 if df.empty:
     st.caption("아직 로그가 없습니다.")
@@ -17,7 +29,9 @@ st.dataframe(df.tail(100), use_container_width=True)
 st.subheader("일자별 탐지 건수")
 if "ts" in df and not df["ts"].isna().all():
     df["day"] = df["ts"].dt.date
-    agg = df.groupby("day")[["주민등록번호","이메일","전화번호"]].sum(numeric_only=True).fillna(0)
+    # 예전 로그에는 없는 항목(카드번호 등)이 있을 수 있으므로 존재하는 컬럼만 집계
+    kinds = [k for k in DEFAULT_PATTERNS if k in df.columns]
+    agg = df.groupby("day")[kinds].sum(numeric_only=True).fillna(0)
     st.bar_chart(agg)
 else:
     st.caption("날짜 정보를 파싱할 수 없습니다.")
@@ -0,0 +1,4 @@
+# st_app 모듈들은 `from utils import ...` 형태로 서로를 불러오므로 st_app 을 경로에 추가
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,176 @@
+import os, time
+import pandas as pd
+import pytest
+import crawler
+import utils
+from utils import DEFAULT_PATTERNS
+from crawler import DEFAULT_EXTS, open_manifest, sweep
+
+
+@pytest.fixture
+def share(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "LOG_PATH", str(tmp_path / "audit_log.csv"))
+    root = tmp_path / "share"
+    (root / "a" / "b").mkdir(parents=True)
+    for i in range(20):
+        (root / "a" / f"f{i}.txt").write_text(f"memo {i}", encoding="utf-8")
+    (root / "a" / "b" / "pii.txt").write_text("rrn 900101-1234567", encoding="utf-8")
+    (root / "a" / "list.csv").write_text("name,mail\nkim,kim@example.com\n", encoding="utf-8")
+    (root / "bad.xlsx").write_bytes(b"not an excel file")
+    con = open_manifest(str(tmp_path / "manifest.db"))
+    yield root, con, tmp_path
+    con.close()
+
+
+def _sweep(root, con, **kw):
+    return sweep(str(root), con, DEFAULT_PATTERNS, set(DEFAULT_EXTS), workers=2, threads=2, **kw)
+
+
+def _log(tmp_path):
+    return pd.read_csv(tmp_path / "audit_log.csv")
+
+
+def test_first_sweep_scans_everything_and_logs_hits(share):
+    root, con, tmp_path = share
+    stats = _sweep(root, con)
+    assert stats["seen"] == 23
+    assert stats["scanned"] == 22 and stats["errors"] == 1
+    assert stats["flagged"] == 2
+    assert sorted(os.path.basename(p) for p in _log(tmp_path)["filename"]) == ["list.csv", "pii.txt"]
+
+
+def test_resweep_of_unchanged_share_skips_everything(share):
+    root, con, tmp_path = share
+    _sweep(root, con)
+    stats = _sweep(root, con)
+    # 오류 난 파일은 재시도 간격(첫 실패 후 1일)이 지나기 전까지 건너뜀
+    assert stats["unchanged"] == stats["seen"] == 23
+    assert stats["scanned"] == stats["errors"] == stats["retried"] == 0
+    assert len(_log(tmp_path)) == 2
+
+
+def _error_row(con):
+    return con.execute("SELECT error, attempts, hash FROM files WHERE path LIKE '%bad.xlsx'").fetchone()
+
+
+def test_errored_file_is_retried_with_backoff(share):
+    root, con, _ = share
+    _sweep(root, con)
+    assert _error_row(con)[1] == 1
+    two_days_ago = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 2 * 86400))
+    con.execute("UPDATE files SET scanned=? WHERE path LIKE '%bad.xlsx'", (two_days_ago,))
+    stats = _sweep(root, con)
+    assert stats["retried"] == 1 and stats["errors"] == 1
+    assert _error_row(con)[1] == 2
+    # 두 번째 실패 후에는 2일 간격
+    assert _sweep(root, con)["retried"] == 0
+
+
+def test_retry_errors_rescans_once_dependency_is_fixed(share, monkeypatch):
+    root, con, _ = share
+    _sweep(root, con)
+    assert _error_row(con)[0]
+
+    # openpyxl 설치 등으로 이제는 읽히는 상황 (프로세스 풀은 fork 로 이 패치를 물려받음)
+    def fixed_scan_table(src, filename, patterns, mask=False, **kw):
+        return {"rows": 1, "counts": {n: 0 for n in patterns}, "columns": {}, "masked_csv": ""}
+
+    monkeypatch.setattr(crawler, "scan_table", fixed_scan_table)
+    stats = _sweep(root, con, retry_errors=True)
+    assert stats["retried"] == 1 and stats["scanned"] == 1 and stats["errors"] == 0
+    error, attempts, digest = _error_row(con)
+    assert error is None and attempts == 0 and digest
+    assert _sweep(root, con)["unchanged"] == 23
+
+
+def test_retry_due_doubles_interval():
+    now = time.time()
+
+    def ago(days):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now - days * 86400 - 1))
+
+    assert crawler.retry_due(ago(1), 1, now)
+    assert not crawler.retry_due(ago(1), 2, now)
+    assert crawler.retry_due(ago(2), 2, now)
+    assert not crawler.retry_due(ago(29), 10, now)
+    assert crawler.retry_due(ago(30), 10, now)
+    assert crawler.retry_due(None, 0, now)
+
+
+def test_touched_file_with_same_content_is_not_rescanned(share):
+    root, con, _ = share
+    _sweep(root, con)
+    p = root / "a" / "b" / "pii.txt"
+    t = time.time() + 10
+    os.utime(p, (t, t))
+    stats = _sweep(root, con)
+    assert stats["same_hash"] == 1 and stats["scanned"] == 0
+    stats = _sweep(root, con)
+    assert stats["unchanged"] == 23
+
+
+def test_modified_file_is_rescanned_and_masked(share):
+    root, con, tmp_path = share
+    _sweep(root, con)
+    (root / "a" / "f3.txt").write_text("call 010-1234-5678 now", encoding="utf-8")
+    stats = _sweep(root, con, mask_dir=str(tmp_path / "masked"))
+    assert stats["scanned"] == 1 and stats["flagged"] == 1
+    assert (tmp_path / "masked" / "a" / "f3.txt").read_text(encoding="utf-8") == "call ***-****-**** now"
+    assert _log(tmp_path)["전화번호"].iloc[-1] == 1
+
+
+def test_error_row_is_retried_after_file_changes(share):
+    root, con, _ = share
+    _sweep(root, con)
+    err = con.execute("SELECT hash, error FROM files WHERE path LIKE '%bad.xlsx'").fetchone()
+    assert err[0] is None and err[1]
+    (root / "bad.xlsx").write_bytes(b"still not an excel file")
+    stats = _sweep(root, con)
+    assert stats["errors"] == 1 and stats["unchanged"] == 22
+
+
+def test_deleted_paths_are_pruned(share):
+    root, con, _ = share
+    _sweep(root, con)
+    (root / "a" / "f0.txt").unlink()
+    stats = _sweep(root, con)
+    assert stats["removed"] == 1
+    assert con.execute("SELECT COUNT(*) FROM files WHERE path LIKE '%f0.txt'").fetchone()[0] == 0
+    assert con.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 22
+
+
+def _rows(con):
+    return con.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+def test_unlisted_directory_is_not_pruned(share, monkeypatch):
+    root, con, _ = share
+    _sweep(root, con)
+    real_scandir = os.scandir
+    broken = str(root / "a")
+
+    def scandir(path):
+        if str(path) == broken:
+            raise PermissionError(13, "denied", path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(crawler.os, "scandir", scandir)
+    stats = _sweep(root, con)
+    assert stats["unlisted_dirs"] == 1
+    assert stats["removed"] == 0
+    assert _rows(con) == 23
+
+
+def test_unreadable_root_aborts_without_touching_manifest(share):
+    root, con, tmp_path = share
+    _sweep(root, con)
+    root.rename(tmp_path / "unmounted")
+    with pytest.raises(OSError):
+        _sweep(root, con)
+    assert _rows(con) == 23
+
+
+def test_main_exits_non_zero_for_missing_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "LOG_PATH", str(tmp_path / "audit_log.csv"))
+    rc = crawler.main([str(tmp_path / "missing"), "--manifest", str(tmp_path / "m.db"), "--workers", "1"])
+    assert rc == 1
@@ -0,0 +1,118 @@
+import os, time
+import pandas as pd
+import pytest
+import jobs
+import utils
+from utils import DEFAULT_PATTERNS
+
+TEXT = b"rrn 900101-1234567 mail kim@example.com"
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_DB", str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(jobs, "JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(utils, "LOG_PATH", str(tmp_path / "audit_log.csv"))
+    spawned = []
+    # 워커 프로세스 대신 시작 요청만 기록하고, 테스트에서 run_job 을 직접 호출
+    monkeypatch.setattr(jobs, "_spawn", spawned.append)
+    return spawned
+
+
+def _submit(user, name="a.txt", data=TEXT):
+    return jobs.submit_job(user, "file", name, data, {"patterns": DEFAULT_PATTERNS})
+
+
+def _status(job_id):
+    return jobs.get_job(job_id)["status"]
+
+
+def test_per_user_and_global_limits(queue):
+    ids = {u: [_submit(u) for _ in range(3)] for u in ("u1", "u2", "u3")}
+    assert queue == ids["u1"][:2] + ids["u2"][:2]
+    assert [_status(i) for i in ids["u3"]] == ["queued"] * 3
+    assert jobs.count_active_jobs() == 9
+
+    # 끝난 워커가 슬롯을 비우면 다음 대기 작업 시작
+    jobs.run_job(ids["u1"][0])
+    assert _status(ids["u1"][0]) == "done"
+    assert queue[-1] == ids["u1"][2]
+
+
+def test_cancel_queued_job(queue):
+    a, b, c = (_submit("u") for _ in range(3))
+    jobs.cancel_job(c)
+    assert _status(c) == "cancelled"
+    assert not os.path.exists(jobs._input_path(c))
+
+
+def test_cancel_running_job(queue):
+    job_id = _submit("u")
+    jobs.cancel_job(job_id)
+    assert _status(job_id) == "running"   # 워커가 다음 진행률 보고 때 중단
+    assert os.path.exists(jobs._input_path(job_id))
+    jobs.run_job(job_id)
+    assert _status(job_id) == "cancelled"
+    assert not os.path.exists(jobs._input_path(job_id))
+
+
+def test_stale_job_is_reaped_and_not_revived(queue):
+    a, b, c = (_submit("u") for _ in range(3))
+    con = jobs._connect()
+    con.execute("UPDATE jobs SET updated=? WHERE id=?", (time.time() - jobs.STALE_SEC - 1, a))
+    con.close()
+    jobs.dispatch()
+    assert _status(a) == "failed"
+    assert not os.path.exists(jobs._input_path(a))   # 원본 업로드 삭제
+    assert _status(c) == "running" and queue[-1] == c
+
+    jobs._finish(a, "done", {"counts": {}})
+    assert _status(a) == "failed"
+
+
+def test_stale_submitting_row_is_cleaned(queue):
+    con = jobs._connect()
+    cur = con.execute("INSERT INTO jobs (user, kind, name, status, created) VALUES ('u', 'file', 'x', 'submitting', ?)",
+                      ("2000-01-01 00:00:00",))
+    job_id = cur.lastrowid
+    con.close()
+    jobs.dispatch()
+    assert _status(job_id) == "failed"
+
+
+def test_expired_jobs_are_purged(queue):
+    job_id = _submit("u")
+    jobs.run_job(job_id)
+    con = jobs._connect()
+    con.execute("UPDATE jobs SET finished='2000-01-01 00:00:00' WHERE id=?", (job_id,))
+    con.close()
+    jobs.dispatch()
+    assert jobs.get_job(job_id) is None
+
+
+def test_file_result_is_persisted_and_logged(queue, tmp_path):
+    job_id = _submit("u")
+    jobs.run_job(job_id)
+    job = jobs.get_job(job_id)
+    assert job["status"] == "done" and job["progress"] == 1.0
+    assert job["result"]["counts"]["주민등록번호"] == 1
+    assert "900101-1234567" not in job["result"]["masked_preview"]
+    log = pd.read_csv(tmp_path / "audit_log.csv")
+    assert list(log["filename"]) == ["a.txt"]
+
+
+def test_tabular_job_writes_masked_output(queue):
+    job_id = _submit("u", "list.csv", b"name,mail\nkim,kim@example.com\n")
+    jobs.run_job(job_id)
+    res = jobs.get_job(job_id)["result"]
+    assert res["columns"] == {"mail": {"이메일": 1}}
+    with open(res["masked_path"], encoding="utf-8") as f:
+        assert "kim@example.com" not in f.read()
+
+
+def test_email_result_keeps_no_raw_pii(queue):
+    job_id = jobs.submit_job("u", "email", "본문 40자", b"kim@example.com 010-1234-5678 http://bit.ly/x",
+                             {"policies": utils.DEFAULT_POLICIES})
+    jobs.run_job(job_id)
+    res = jobs.get_job(job_id)["result"]
+    assert res == {"email_count": 1, "phone_count": 1, "url_count": 1, "bad_urls": ["http://bit.ly/x"]}
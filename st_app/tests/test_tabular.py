@@ -0,0 +1,90 @@
+import io
+import pandas as pd
+import utils
+from utils import DEFAULT_PATTERNS
+from tabular import classify_columns, scan_table
+
+
+def _csv(rows, header="name,note"):
+    return io.BytesIO((header + "\n" + "\n".join(rows) + "\n").encode("utf-8"))
+
+
+def test_classify_columns_flags_on_single_hit():
+    df = pd.DataFrame({"note": ["x"] * 99 + ["900101-1234567"], "name": ["kim"] * 100})
+    assert classify_columns(df, DEFAULT_PATTERNS) == {"note": ["주민등록번호"]}
+
+
+def test_classify_columns_only_adds_new_pairs():
+    df = pd.DataFrame({"c": ["a@b.com", "010-1234-5678"]})
+    flagged = {"c": ["이메일"]}
+    classify_columns(df, DEFAULT_PATTERNS, flagged)
+    assert flagged == {"c": ["이메일", "전화번호"]}
+
+
+def test_sparse_pii_is_counted_and_masked():
+    rows = [f"u{i},{'900101-1234567' if i % 50 == 0 else 'memo'}" for i in range(1000)]
+    res = scan_table(_csv(rows), "t.csv", DEFAULT_PATTERNS, mask=True)
+    assert res["counts"]["주민등록번호"] == 20
+    assert res["columns"] == {"note": {"주민등록번호": 20}}
+    assert "900101-1234567" not in res["masked_csv"]
+
+
+def test_pii_only_in_later_chunk_is_found():
+    rows = [f"u{i},{'kim@example.com' if i >= 150 else 'memo'}" for i in range(300)]
+    res = scan_table(_csv(rows), "t.csv", DEFAULT_PATTERNS, mask=True, chunksize=100)
+    assert res["rows"] == 300
+    assert res["counts"]["이메일"] == 150
+    assert "kim@example.com" not in res["masked_csv"]
+    # 헤더는 첫 청크에만
+    assert res["masked_csv"].count("name,note") == 1
+
+
+def test_clean_columns_are_left_untouched():
+    res = scan_table(_csv(["kim,010-1234-5678", "lee,hello"]), "t.csv", DEFAULT_PATTERNS, mask=True)
+    masked = pd.read_csv(io.StringIO(res["masked_csv"]), dtype=str)
+    assert list(masked["name"]) == ["kim", "lee"]
+    assert list(masked["note"]) == ["***-****-****", "hello"]
+    assert list(res["preview"]["note"]) == ["010-1234-5678", "hello"]
+
+
+def test_card_numbers_are_masked():
+    res = scan_table(_csv(["kim,1234-5678-9012-3456", "lee,4111111111111111"]), "t.csv",
+                     DEFAULT_PATTERNS, mask=True)
+    assert res["counts"]["카드번호"] == 2
+    assert "1234-5678" not in res["masked_csv"] and "4111111111111111" not in res["masked_csv"]
+
+
+def test_empty_csv_returns_empty_result():
+    res = scan_table(io.BytesIO(b""), "empty.csv", DEFAULT_PATTERNS, mask=True)
+    assert res["rows"] == 0
+    assert all(v == 0 for v in res["counts"].values())
+    assert res["columns"] == {}
+    assert res["preview"].empty and res["masked_preview"].empty
+    assert res["masked_csv"] == ""
+
+
+def test_progress_callback_per_chunk():
+    seen = []
+    scan_table(_csv([f"u{i},memo" for i in range(250)]), "t.csv", DEFAULT_PATTERNS,
+               chunksize=100, progress=seen.append)
+    assert seen == [100, 200, 250]
+
+
+def test_log_detections_appends_and_rewrites(tmp_path, monkeypatch):
+    log = tmp_path / "audit_log.csv"
+    monkeypatch.setattr(utils, "LOG_PATH", str(log))
+    utils.log_detections([("a.txt", {"이메일": 1}, None), ("b.txt", {"이메일": 2}, None)])
+    utils.log_detections([("c.txt", {"이메일": 3}, None)])   # 같은 컬럼 → 뒤에 추가
+    df = pd.read_csv(log)
+    assert list(df["filename"]) == ["a.txt", "b.txt", "c.txt"]
+
+    # 새 컬럼이 생기면 전체를 다시 써서 헤더를 넓힘
+    utils.log_detection("d.csv", {"이메일": 4}, {"mail": {"이메일": 4}})
+    df = pd.read_csv(log)
+    assert list(df.columns) == ["ts", "filename", *DEFAULT_PATTERNS, "columns"]
+    assert list(df["이메일"]) == [1, 2, 3, 4]
+    assert list(df["주민등록번호"]) == [0, 0, 0, 0]
+    assert df["columns"].iloc[-1] == "mail:이메일=4"
+
+    utils.log_detections([])
+    assert len(pd.read_csv(log)) == 4
@@ -1,5 +1,6 @@
-import os, re, time, io, hashlib
+import os, re, time, io, hashlib, sqlite3
 import pandas as pd
+from contextlib import contextmanager
 from typing import Dict, List
 
 LOG_PATH = os.path.join(os.path.dirname(__file__), "audit_log.csv")
@@ -8,6 +9,7 @@ DEFAULT_PATTERNS: Dict[str, str] = {
     "주민등록번호": r"\b\d{6}-\d{7}\b",
     "이메일": r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}",
     "전화번호": r"\b01[016789]-?\d{3,4}-?\d{4}\b",
+    "카드번호": r"\b\d{4}-?\d{4}-?\d{4}-?\d{4}\b",
 }
 
 DEFAULT_POLICIES = {
@@ -29,42 +31,91 @@ def get_policies(session_state) -> Dict[str, str]:
         session_state.policies = DEFAULT_POLICIES.copy()
     return session_state.policies
 
+def _mask_repl(name: str):
+    # 패턴 이름별 마스킹 치환값 (문자열 또는 re.sub 용 함수)
+    if name == "이메일":
+        return lambda m: m.group(0).split("@")[0][:2] + "***@***"
+    elif name == "주민등록번호":
+        return "******-*******"
+    elif name == "전화번호":
+        return "***-****-****"
+    elif name == "카드번호":
+        return "****-****-****-****"
+    return "***"
+
 def mask_text(text: str, patterns: Dict[str, str]) -> str:
     masked = text
     for name, pat in patterns.items():
-        if name == "이메일":
-            masked = re.sub(pat, lambda m: m.group(0).split("@")[0][:2] + "***@***", masked)
-        elif name == "주민등록번호":
-            masked = re.sub(pat, "******-*******", masked)
-        elif name == "전화번호":
-            masked = re.sub(pat, "***-****-****", masked)
-        else:
-            masked = re.sub(pat, "***", masked)
+        masked = re.sub(pat, _mask_repl(name), masked)
     return masked
 
+def mask_series(s: pd.Series, name: str, pat: str) -> pd.Series:
+    """컬럼 단위 마스킹 (벡터화된 str.replace)"""
+    repl = _mask_repl(name)
+    if isinstance(repl, str):
+        # 문자열 치환값은 역참조(\1 등)로 해석되지 않도록 이스케이프
+        repl = repl.replace("\\", "\\\\")
+    return s.str.replace(pat, repl, regex=True)
+
 def highlight_html(text: str, patterns: Dict[str, str]) -> str:
     html = text
     colors = {
         "주민등록번호": "#fff3cd",  # 연노랑
         "이메일": "#e0f7fa",       # 연하늘
         "전화번호": "#fce4ec",     # 연핑크
+        "카드번호": "#ede7f6",     # 연보라
     }
     for name, pat in patterns.items():
         color = colors.get(name, "#e8eaf6")
         html = re.sub(pat, lambda m: f"<mark style='background:{color}'>{m.group(0)}</mark>", html)
     return f"<div style='white-space:pre-wrap'>{html}</div>"
 
-def log_detection(filename: str, counts: Dict[str, int]):
+def _log_row(filename: str, counts: Dict[str, int], columns: Dict[str, Dict[str, int]] = None) -> dict:
     row = {
         "ts": time.strftime("%Y-%m-%d %H:%M:%S"),
         "filename": filename,
     }
+    # 기본 탐지 항목은 항상 컬럼으로 남김 (이메일 검사처럼 일부만 세는 기록이 먼저 쓰여도
+    # 대시보드 집계 컬럼이 빠지지 않도록)
+    row.update({k: 0 for k in DEFAULT_PATTERNS})
     row.update({k: int(v) for k, v in counts.items()})
-    df = pd.DataFrame([row])
-    if os.path.exists(LOG_PATH):
-        old = pd.read_csv(LOG_PATH)
-        df = pd.concat([old, df], ignore_index=True)
-    df.to_csv(LOG_PATH, index=False)
+    if columns:
+        # 표 형식 검사: 컬럼별 요약 (예: "연락처:전화번호=120; 메일:이메일=98")
+        row["columns"] = "; ".join(
+            f"{col}:{name}={int(n)}" for col, hits in columns.items() for name, n in hits.items()
+        )
+    return row
+
+@contextmanager
+def _log_lock():
+    # audit_log.csv 는 파일 검사 페이지, 백그라운드 워커, 크롤러가 함께 쓰고 읽고-합쳐-쓰는 경우도 있어
+    # 동시에 쓰면 행이 유실될 수 있음 → SQLite 쓰기 잠금을 프로세스 간 락으로 사용
+    # (잠금을 쥔 프로세스가 죽어도 자동으로 풀림)
+    con = sqlite3.connect(LOG_PATH + ".lock", timeout=60, isolation_level=None)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        yield
+    finally:
+        con.close()
+
+def log_detection(filename: str, counts: Dict[str, int], columns: Dict[str, Dict[str, int]] = None):
+    log_detections([(filename, counts, columns)])
+
+def log_detections(entries: List[tuple]):
+    """(filename, counts, columns) 목록을 한 번에 기록 (크롤러 등 대량 기록용)"""
+    if not entries:
+        return
+    df = pd.DataFrame([_log_row(*e) for e in entries])
+    with _log_lock():
+        if os.path.exists(LOG_PATH):
+            header = list(pd.read_csv(LOG_PATH, nrows=0).columns)
+            if set(df.columns) <= set(header):
+                # 기존 컬럼 안에 들어가면 전체를 다시 쓰지 않고 뒤에 추가
+                df.reindex(columns=header).to_csv(LOG_PATH, mode="a", header=False, index=False)
+                return
+            old = pd.read_csv(LOG_PATH)
+            df = pd.concat([old, df], ignore_index=True)
+        df.to_csv(LOG_PATH, index=False)
 
 def read_log() -> pd.DataFrame:
     if os.path.exists(LOG_PATH):
@@ -75,7 +126,7 @@ def read_log() -> pd.DataFrame:
             return df
         except Exception:
             pass
-    return pd.DataFrame(columns=["ts","filename","주민등록번호","이메일","전화번호"])
+    return pd.DataFrame(columns=["ts", "filename", *DEFAULT_PATTERNS])
 
 def bytes_from_text(s: str) -> io.BytesIO:
     return io.BytesIO(s.encode("utf-8"))
@@ -95,5 +146,20 @@ def classify_urls(urls: List[str], policies: Dict[str, str]):
             ok.append(u)
     return ok, bad
 
+EMAIL_REGEX = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+PHONE_REGEX = r"\b01[016789]-?\d{3,4}-?\d{4}\b"
+
+def scan_email(body_text: str, policies: Dict[str, str]) -> Dict[str, List[str]]:
+    # 단순 PII 패턴(데모) – 파일 검사보다 간략
+    urls = extract_urls(body_text)
+    ok_urls, bad_urls = classify_urls(urls, policies)
+    return {
+        "emails": re.findall(EMAIL_REGEX, body_text),
+        "phones": re.findall(PHONE_REGEX, body_text),
+        "urls": urls,
+        "ok_urls": ok_urls,
+        "bad_urls": bad_urls,
+    }
+
 def sha256_short(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:10]